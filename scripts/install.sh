@@ -137,8 +137,7 @@ apt-get install -y \
 
 # USB Music Player packages
 apt-get install -y \
-    mpg123 \
-    ffmpeg \
+    mpv \
     exfat-fuse \
     exfatprogs \
     ntfs-3g
@@ -479,6 +478,10 @@ log_info "Installing USB player service script..."
 cp "$PROJECT_DIR/web/usb_player.py" "$INSTALL_DIR/"
 chmod +x "$INSTALL_DIR/usb_player.py"
 
+# Pre-compile the imported modules so the web service doesn't compile on
+# first start (bt_agent.py and usb_player.py run as __main__ and never use a .pyc)
+"$INSTALL_DIR/venv/bin/python" -m compileall -q "$INSTALL_DIR/web"
+
 # Create USB mount point
 mkdir -p /media/usb
 chmod 755 /media/usb
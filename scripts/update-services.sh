@@ -36,6 +36,15 @@ PROJECT_DIR="$(dirname "$SCRIPT_DIR")"
 
 log_info "Updating systemd service files..."
 
+# The web unit runs gunicorn from the venv, so make sure its dependencies are current
+INSTALL_DIR="/opt/bluetooth-receiver"
+if [ -x "$INSTALL_DIR/venv/bin/pip" ]; then
+    log_info "Updating Python dependencies..."
+    "$INSTALL_DIR/venv/bin/pip" install -r "$PROJECT_DIR/web/requirements.txt"
+else
+    log_warn "Virtualenv not found at $INSTALL_DIR/venv - run install.sh first"
+fi
+
 # Stop services
 log_info "Stopping services..."
 systemctl stop bluealsa-aplay 2>/dev/null || true
@@ -4,24 +4,68 @@ Flask Web Application for RPI Bluetooth Audio Receiver
 Provides REST API and web interface for Bluetooth management
 """
 
+# Patch blocking calls (subprocess waits, sockets) to yield to other requests.
+# Must run before anything else imports socket/threading/subprocess.
+try:
+    from gevent import monkey
+    monkey.patch_all()
+except ImportError:
+    pass
+
 from flask import Flask, render_template, jsonify, request
-from flask_cors import CORS
+from flask.json.provider import DefaultJSONProvider
 import logging
+import os
+import re
 import subprocess
 import socket
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from bluetooth_manager import BluetoothManager
 import usb_player
 
+try:
+    import alsaaudio
+except ImportError:
+    alsaaudio = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from pyroute2 import IPRoute
+except ImportError:
+    IPRoute = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%H:%M:%S'
 )
 logger = logging.getLogger('BluetoothWeb')
 
+# Skip per-request access log lines; warnings and errors still come through
+logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes with orjson instead of the stdlib"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 # Initialize Flask app
 app = Flask(__name__)
-CORS(app)
+if orjson is not None:
+    app.json = ORJSONProvider(app)
 
 # Initialize Bluetooth manager
 bt_manager = BluetoothManager()
@@ -29,13 +73,75 @@ bt_manager = BluetoothManager()
 # Initialize local music player
 usb_music_player = usb_player.LocalMusicPlayer()
 
+# Subprocess command lines, built once
+_HOSTNAME_CMD = ('hostname', '-I')
+_AMIXER_SCONTROLS = ('amixer', 'scontrols')
+_AMIXER_SCONTENTS = ('amixer', 'scontents')
+_AMIXER_PCM_SGET = ('amixer', '-c', '0', 'sget', 'PCM')
+_AMIXER_PCM_SSET = ('amixer', '-c', '0', 'sset', 'PCM')
+
+# Discarded subprocess output goes here; subprocess.DEVNULL would open and
+# close /dev/null again for every amixer/hostname call
+_DEVNULL = os.open(os.devnull, os.O_WRONLY)
+
+# Netlink socket for address lookups, opened on first use
+_iproute = None
+
+# Hostname and IP rarely change, so cache them between status polls
+SYSTEM_INFO_TTL = 30  # seconds
+_system_info_cache = {}
+
+# BlueALSA control name only changes when a device connects or disconnects
+BLUEALSA_CONTROL_TTL = 30  # seconds
+# BlueALSA creates the control shortly after a device connects, so a miss is
+# only trusted briefly
+BLUEALSA_CONTROL_MISS_TTL = 1  # seconds
+_BLUEALSA_CONTROL_RE = re.compile(r"'([^']*A2DP[^']*)'")
+# One "Simple mixer control" block of `amixer scontents` output: (name, body)
+_SCONTENTS_RE = re.compile(rb"^Simple mixer control '([^']*)',\d+\n((?:[ \t].*\n?)*)", re.M)
+# First playback percentage in amixer output, e.g. "Front Left: Playback 80 [63%] [on]"
+_VOL_RE = re.compile(rb'Playback[^\n]*\[(\d+)%\]')
+_bluealsa_control_cache = {'name': None, 'expires': 0, 'device': None}
+
+# Open ALSA mixer handles, keyed by (control, cardindex)
+_mixers = {}
+
+# Runs the independent D-Bus/subprocess lookups behind /api/status concurrently
+_status_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix='status')
+
+# Serialized /api/status body, shared by polls that land within the TTL
+STATUS_CACHE_TTL = 1  # seconds
+_status_cache = {'body': None, 'etag': None, 'expires': 0, 'lock': threading.Lock()}
+
+# index.html has no per-request variables, so it is rendered once and reused
+INDEX_MAX_AGE = 300  # seconds
+_index_html = None
+
 
 # Helper functions
+def _dumps_bytes(obj):
+    """Serialize obj to JSON bytes, skipping the str round trip with orjson"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return app.json.dumps(obj).encode()
+
+
+def _cached(key, ttl, fetch):
+    """Return a cached value, calling fetch() once it is older than ttl seconds"""
+    now = time.monotonic()
+    entry = _system_info_cache.get(key)
+    if entry and now < entry[1]:
+        return entry[0]
+    value = fetch()
+    _system_info_cache[key] = (value, now + ttl)
+    return value
+
+
 def get_system_info():
     """Get system information"""
     try:
-        hostname = socket.gethostname()
-        ip_address = get_ip_address()
+        hostname = _cached('hostname', SYSTEM_INFO_TTL, socket.gethostname)
+        ip_address = _cached('ip_address', SYSTEM_INFO_TTL, get_ip_address)
         return {
             'hostname': hostname,
             'ip_address': ip_address
@@ -45,16 +151,34 @@ def get_system_info():
         return {'hostname': 'Unknown', 'ip_address': 'Unknown'}
 
 
+def _netlink_ip_address(interface='wlan0'):
+    """Read the interface's IPv4 address over netlink, or None if unavailable"""
+    global _iproute
+    if IPRoute is None:
+        return None
+    try:
+        if _iproute is None:
+            _iproute = IPRoute()
+        addrs = _iproute.get_addr(label=interface, family=socket.AF_INET)
+        return addrs[0].get_attr('IFA_ADDRESS') if addrs else None
+    except Exception as e:
+        logger.debug(f"Could not read {interface} address over netlink: {e}")
+        return None
+
+
 def get_ip_address():
     """Get wlan0 IP address"""
+    ip_address = _netlink_ip_address()
+    if ip_address:
+        return ip_address
+
     try:
-        result = subprocess.run(
-            ['hostname', '-I'],
-            capture_output=True,
-            text=True,
+        output = subprocess.check_output(
+            _HOSTNAME_CMD,
+            stderr=_DEVNULL,
             timeout=5
         )
-        ips = result.stdout.strip().split()
+        ips = output.decode().split()
         # Return the first IP (usually wlan0)
         return ips[0] if ips else '192.168.4.1'
     except Exception as e:
@@ -62,76 +186,166 @@ def get_ip_address():
         return '192.168.4.1'
 
 
+def invalidate_bluealsa_cache():
+    """Force the next get_bluealsa_control() call to rediscover the control"""
+    _bluealsa_control_cache['expires'] = 0
+    _mixers.clear()
+
+
+def _get_mixer(control, cardindex=-1):
+    """Get a cached alsaaudio mixer for control, opening it on first use"""
+    key = (control, cardindex)
+    mixer = _mixers.get(key)
+    if mixer is None:
+        mixer = alsaaudio.Mixer(control, cardindex=cardindex)
+        _mixers[key] = mixer
+    elif hasattr(mixer, 'handleevents'):
+        # Pick up changes made by other mixer clients since the last read
+        mixer.handleevents()
+    return mixer
+
+
+def _mixer_get_volume(control, cardindex=-1):
+    """Read volume via the ALSA mixer binding, or None if unavailable"""
+    if alsaaudio is None:
+        return None
+    try:
+        return int(_get_mixer(control, cardindex).getvolume()[0])
+    except alsaaudio.ALSAAudioError as e:
+        logger.debug(f"Could not read mixer {control}: {e}")
+        _mixers.pop((control, cardindex), None)
+        return None
+
+
+def _mixer_set_volume(control, level, cardindex=-1):
+    """Set volume via the ALSA mixer binding, returning False if unavailable"""
+    if alsaaudio is None:
+        return False
+    try:
+        _get_mixer(control, cardindex).setvolume(level)
+        return True
+    except alsaaudio.ALSAAudioError as e:
+        logger.debug(f"Could not set mixer {control}: {e}")
+        _mixers.pop((control, cardindex), None)
+        return False
+
+
 def get_bluealsa_control():
     """Get the BlueALSA software volume control name for connected device"""
+    if time.monotonic() < _bluealsa_control_cache['expires']:
+        return _bluealsa_control_cache['name']
+
     try:
-        result = subprocess.run(
-            ['amixer', 'scontrols'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        # Look for BlueALSA A2DP control (e.g., "Simple mixer control 'Device A2DP',0")
-        for line in result.stdout.split('\n'):
-            if 'A2DP' in line:
-                # Extract control name between quotes
-                start = line.find("'") + 1
-                end = line.find("'", start)
-                if start > 0 and end > 0:
-                    control_name = line[start:end]
-                    logger.debug(f"Found BlueALSA control: {control_name}")
-                    return control_name
-        return None
+        if alsaaudio is not None:
+            control_name = next((c for c in alsaaudio.mixers() if 'A2DP' in c), None)
+        else:
+            output = subprocess.check_output(
+                _AMIXER_SCONTROLS,
+                stderr=_DEVNULL,
+                timeout=5
+            )
+            # Look for BlueALSA A2DP control (e.g., "Simple mixer control 'Device A2DP',0")
+            match = _BLUEALSA_CONTROL_RE.search(output.decode())
+            control_name = match.group(1) if match else None
+        if control_name:
+            logger.debug("Found BlueALSA control: %s", control_name)
     except Exception as e:
         logger.error(f"Error getting BlueALSA control: {e}")
         return None
 
+    _bluealsa_control_cache['name'] = control_name
+    _bluealsa_control_cache['expires'] = time.monotonic() + (
+        BLUEALSA_CONTROL_TTL if control_name else BLUEALSA_CONTROL_MISS_TTL
+    )
+    return control_name
 
-def get_volume():
-    """Get current volume level"""
+
+def invalidate_status_cache():
+    """Force the next /api/status request to recompute its response"""
+    _status_cache['expires'] = 0
+
+
+def _track_connected_device(connected_device):
+    """
+    Invalidate the BlueALSA control cache when the connected device changes
+
+    Returns:
+        True if the connected device changed, False otherwise
+    """
+    address = connected_device.address if connected_device else None
+    if address != _bluealsa_control_cache['device']:
+        _bluealsa_control_cache['device'] = address
+        invalidate_bluealsa_cache()
+        return True
+    return False
+
+
+def _amixer_bluealsa_volume():
+    """Find the BlueALSA control and read its volume with a single amixer call"""
+    try:
+        output = subprocess.check_output(
+            _AMIXER_SCONTENTS,
+            stderr=_DEVNULL,
+            timeout=5
+        )
+    except Exception as e:
+        logger.debug(f"Could not read amixer controls: {e}")
+        return None, None
+
+    for name, body in _SCONTENTS_RE.findall(output):
+        if b'A2DP' not in name:
+            continue
+        match = _VOL_RE.search(body)
+        if match:
+            name = name.decode()
+            _bluealsa_control_cache['name'] = name
+            _bluealsa_control_cache['expires'] = time.monotonic() + BLUEALSA_CONTROL_TTL
+            return name, int(match.group(1))
+    return None, None
+
+
+def get_volume(device_connected=True):
+    """
+    Get current volume level
+
+    Args:
+        device_connected: False when no Bluetooth device is known to be
+            connected, which skips the BlueALSA lookup entirely
+
+    Returns:
+        Volume percentage
+    """
     # First try to get BlueALSA software volume
-    bluealsa_control = get_bluealsa_control()
-    if bluealsa_control:
-        try:
-            result = subprocess.run(
-                ['amixer', 'sget', bluealsa_control],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if result.returncode == 0:
-                # Parse volume from amixer output
-                for line in result.stdout.split('\n'):
-                    if 'Playback' in line and '%' in line:
-                        # Extract percentage
-                        start = line.find('[') + 1
-                        end = line.find('%]')
-                        if start > 0 and end > 0:
-                            volume = int(line[start:end])
-                            logger.info(f"Got volume {volume}% from BlueALSA: {bluealsa_control}")
-                            return volume
-        except Exception as e:
-            logger.debug(f"Could not get volume from BlueALSA control: {e}")
+    bluealsa_control = None
+    volume = None
+    if device_connected:
+        bluealsa_control = get_bluealsa_control() if alsaaudio is not None else None
+        volume = _mixer_get_volume(bluealsa_control) if bluealsa_control else None
+        if volume is None and (bluealsa_control or alsaaudio is None):
+            bluealsa_control, volume = _amixer_bluealsa_volume()
+    if volume is not None:
+        logger.debug("Got volume %s%% from BlueALSA: %s", volume, bluealsa_control)
+        return volume
 
     # Use hardware PCM control on card 0 (Headphones/3.5mm jack)
+    volume = _mixer_get_volume('PCM', cardindex=0)
+    if volume is not None:
+        logger.debug("Got volume %s%% from card 0 PCM", volume)
+        return volume
     try:
         result = subprocess.run(
-            ['amixer', '-c', '0', 'sget', 'PCM'],
-            capture_output=True,
-            text=True,
+            _AMIXER_PCM_SGET,
+            stdout=subprocess.PIPE,
+            stderr=_DEVNULL,
             timeout=5
         )
         if result.returncode == 0:
             # Parse volume from amixer output
-            for line in result.stdout.split('\n'):
-                if 'Playback' in line and '%' in line:
-                    # Extract percentage
-                    start = line.find('[') + 1
-                    end = line.find('%]')
-                    if start > 0 and end > 0:
-                        volume = int(line[start:end])
-                        logger.info(f"Got volume {volume}% from card 0 PCM")
-                        return volume
+            match = _VOL_RE.search(result.stdout)
+            if match:
+                volume = int(match.group(1))
+                logger.debug("Got volume %s%% from card 0 PCM", volume)
+                return volume
     except Exception as e:
         logger.error(f"Could not get volume from card 0 PCM: {e}")
 
@@ -141,32 +355,42 @@ def get_volume():
 
 def set_volume(level):
     """Set volume level (0-100)"""
+    # The device cache is in memory, so pick up a connect or disconnect that
+    # happened since the last status poll before trusting the cached control
+    _track_connected_device(bt_manager.get_connected_device())
+
     # First try BlueALSA software volume
     bluealsa_control = get_bluealsa_control()
     if bluealsa_control:
+        if _mixer_set_volume(bluealsa_control, level):
+            logger.debug("Set volume to %s%% on BlueALSA: %s", level, bluealsa_control)
+            return True
         try:
             result = subprocess.run(
-                ['amixer', 'sset', bluealsa_control, f'{level}%'],
-                capture_output=True,
-                text=True,
+                ('amixer', 'sset', bluealsa_control, f'{level}%'),
+                stdout=_DEVNULL,
+                stderr=_DEVNULL,
                 timeout=5
             )
             if result.returncode == 0:
-                logger.info(f"Set volume to {level}% on BlueALSA: {bluealsa_control}")
+                logger.debug("Set volume to %s%% on BlueALSA: %s", level, bluealsa_control)
                 return True
         except Exception as e:
             logger.debug(f"Could not set volume on BlueALSA control: {e}")
 
     # Use hardware PCM control on card 0 (Headphones/3.5mm jack)
+    if _mixer_set_volume('PCM', level, cardindex=0):
+        logger.debug("Set volume to %s%% on card 0 PCM", level)
+        return True
     try:
         result = subprocess.run(
-            ['amixer', '-c', '0', 'sset', 'PCM', f'{level}%'],
-            capture_output=True,
-            text=True,
+            (*_AMIXER_PCM_SSET, f'{level}%'),
+            stdout=_DEVNULL,
+            stderr=_DEVNULL,
             timeout=5
         )
         if result.returncode == 0:
-            logger.info(f"Set volume to {level}% on card 0 PCM")
+            logger.debug("Set volume to %s%% on card 0 PCM", level)
             return True
     except Exception as e:
         logger.error(f"Could not set volume on card 0 PCM: {e}")
@@ -174,29 +398,76 @@ def set_volume(level):
     return False
 
 
+# CORS: the appliance allows any origin, so a static header is enough
+@app.before_request
+def cors_preflight():
+    """Answer CORS preflight requests without dispatching to a route"""
+    if request.method == 'OPTIONS':
+        response = app.response_class(status=204)
+        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, DELETE, OPTIONS'
+        response.headers['Access-Control-Allow-Headers'] = request.headers.get(
+            'Access-Control-Request-Headers', 'Content-Type'
+        )
+        return response
+
+
+@app.after_request
+def add_cors_headers(response):
+    """Allow cross-origin access to every response"""
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    return response
+
+
 # Routes
 @app.route('/')
 def index():
     """Serve main web interface"""
-    return render_template('index.html')
+    global _index_html
+    if _index_html is None:
+        _index_html = render_template('index.html')
+    response = app.response_class(_index_html, mimetype='text/html')
+    response.cache_control.public = True
+    response.cache_control.max_age = INDEX_MAX_AGE
+    return response
 
 
 @app.route('/api/status', methods=['GET'])
 def get_status():
     """Get system and Bluetooth status"""
     try:
-        adapter_info = bt_manager.get_adapter_info()
-        connected_device = bt_manager.get_connected_device()
-        system_info = get_system_info()
-        volume = get_volume()
-
-        return jsonify({
-            'success': True,
-            'adapter': adapter_info,
-            'connected_device': connected_device,
-            'system': system_info,
-            'volume': volume
-        })
+        with _status_cache['lock']:
+            if time.monotonic() >= _status_cache['expires']:
+                snapshot = _status_pool.submit(bt_manager.get_status_snapshot)
+                system = _status_pool.submit(get_system_info)
+                # No BlueALSA control exists while nothing is connected
+                vol = _status_pool.submit(
+                    get_volume, _bluealsa_control_cache['device'] is not None
+                )
+
+                adapter_info, connected_device = snapshot.result()
+                system_info = system.result()
+                volume = vol.result()
+                if _track_connected_device(connected_device):
+                    # Volume was read from the previous device's mixer control
+                    volume = get_volume(connected_device is not None)
+
+                _status_cache['body'] = _dumps_bytes({
+                    'success': True,
+                    'adapter': adapter_info,
+                    'connected_device': connected_device,
+                    'system': system_info,
+                    'volume': volume
+                })
+                _status_cache['etag'] = format(zlib.crc32(_status_cache['body']), '08x')
+                _status_cache['expires'] = time.monotonic() + STATUS_CACHE_TTL
+            body = _status_cache['body']
+            etag = _status_cache['etag']
+
+        # Browsers revalidate with If-None-Match and get a 304 while nothing changed
+        response = app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
     except Exception as e:
         logger.error(f"Error getting status: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -225,6 +496,7 @@ def set_discoverable():
         timeout = data.get('timeout', 0)
 
         success = bt_manager.set_discoverable(discoverable, timeout)
+        invalidate_status_cache()
 
         if success:
             return jsonify({
@@ -248,6 +520,8 @@ def remove_device(address):
     """Remove a paired device"""
     try:
         success = bt_manager.remove_device(address)
+        invalidate_bluealsa_cache()
+        invalidate_status_cache()
 
         if success:
             return jsonify({
@@ -270,6 +544,7 @@ def trust_device(address):
     """Trust a device for automatic reconnection"""
     try:
         success = bt_manager.trust_device(address)
+        invalidate_status_cache()
 
         if success:
             return jsonify({
@@ -312,6 +587,7 @@ def set_volume_api():
         level = max(0, min(100, int(level)))
 
         success = set_volume(level)
+        invalidate_status_cache()
 
         if success:
             return jsonify({
@@ -330,17 +606,29 @@ def set_volume_api():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def _restart_services():
+    """Restart Bluetooth services (runs in a background thread)"""
+    try:
+        subprocess.run(['systemctl', 'restart', 'bluetooth'], timeout=10, check=True)
+        subprocess.run(['systemctl', 'restart', 'bluealsa'], timeout=10, check=True)
+        logger.info("Services restarted")
+    except Exception as e:
+        logger.error(f"Error restarting services: {e}")
+    finally:
+        invalidate_bluealsa_cache()
+        invalidate_status_cache()
+
+
 @app.route('/api/restart', methods=['POST'])
 def restart_services():
     """Restart Bluetooth services"""
     try:
-        subprocess.run(['systemctl', 'restart', 'bluetooth'], timeout=10, check=True)
-        subprocess.run(['systemctl', 'restart', 'bluealsa'], timeout=10, check=True)
+        threading.Thread(target=_restart_services, daemon=True).start()
 
         return jsonify({
             'success': True,
-            'message': 'Services restarted'
-        })
+            'message': 'Restart requested'
+        }), 202
     except Exception as e:
         logger.error(f"Error restarting services: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -458,24 +746,35 @@ def usb_shuffle():
 # Error Handlers
 ###############################################################################
 
+# Constant error bodies, encoded once at import
+_NOT_FOUND_BODY = b'{"success":false,"error":"Not found"}'
+_INTERNAL_ERROR_BODY = b'{"success":false,"error":"Internal server error"}'
+
+
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({'success': False, 'error': 'Not found'}), 404
+    return app.response_class(_NOT_FOUND_BODY, status=404, mimetype='application/json')
 
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({'success': False, 'error': 'Internal server error'}), 500
+    return app.response_class(_INTERNAL_ERROR_BODY, status=500, mimetype='application/json')
 
 
 if __name__ == '__main__':
     logger.info("Starting Bluetooth Receiver Web Interface...")
     logger.info("Access at http://192.168.4.1 or http://rpi.local")
 
-    # Run Flask app
-    app.run(
-        host='0.0.0.0',
-        port=80,
-        debug=False,
-        threaded=True
-    )
+    # Production runs under gunicorn's gevent worker (see bluetooth-web.service);
+    # fall back to Flask's threaded server when gevent is not installed
+    try:
+        from gevent.pywsgi import WSGIServer
+    except ImportError:
+        app.run(
+            host='0.0.0.0',
+            port=80,
+            debug=False,
+            threaded=True
+        )
+    else:
+        WSGIServer(('0.0.0.0', 80), app).serve_forever()
@@ -5,8 +5,13 @@ Provides D-Bus interface to control BlueZ Bluetooth stack
 """
 
 import dbus
+import dbus.mainloop.glib
+from gi.repository import GLib
 import logging
-from typing import List, Dict, Optional
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Tuple
 
 logger = logging.getLogger('BluetoothManager')
 
@@ -14,6 +19,73 @@ SERVICE_NAME = "org.bluez"
 ADAPTER_INTERFACE = "org.bluez.Adapter1"
 DEVICE_INTERFACE = "org.bluez.Device1"
 PROPERTIES_INTERFACE = "org.freedesktop.DBus.Properties"
+OBJECT_MANAGER_INTERFACE = "org.freedesktop.DBus.ObjectManager"
+
+# Seconds to wait for a BlueZ reply; dbus-python defaults to 25s, which
+# would stall a web request for that long whenever bluetoothd hangs
+DBUS_CALL_TIMEOUT = 5
+
+# Number of per-device proxy tuples kept by BluetoothManager._device()
+DEVICE_PROXY_CACHE_SIZE = 16
+
+
+# (field, D-Bus property, native type, default) for the exposed properties.
+# Properties are converted once when they enter the caches, so building
+# the API records needs no per-request str()/bool() calls.
+ADAPTER_FIELDS = (
+    ('name', 'Name', str, 'Unknown'),
+    ('address', 'Address', str, 'Unknown'),
+    ('powered', 'Powered', bool, False),
+    ('discoverable', 'Discoverable', bool, False),
+    ('pairable', 'Pairable', bool, False),
+    ('discovering', 'Discovering', bool, False)
+)
+DEVICE_FIELDS = (
+    ('address', 'Address', str, 'Unknown'),
+    ('name', 'Name', str, 'Unknown'),
+    ('alias', 'Alias', str, 'Unknown'),
+    ('paired', 'Paired', bool, False),
+    ('connected', 'Connected', bool, False),
+    ('trusted', 'Trusted', bool, False)
+)
+
+
+# Device1 properties that change constantly during discovery and are not cached
+NOISY_DEVICE_PROPERTIES = frozenset({'RSSI', 'ManufacturerData', 'TxPower', 'ServicesResolved'})
+
+
+def _unpack(props, fields) -> Dict:
+    """Convert the exposed D-Bus properties in props to native Python values"""
+    return {key: convert(props[key]) for _, key, convert, _ in fields if key in props}
+
+
+def _adapter_info(props) -> Dict:
+    """Build the adapter info dict from unpacked Adapter1 properties"""
+    return {field: props.get(key, default) for field, key, _, default in ADAPTER_FIELDS}
+
+
+@dataclass
+class Device:
+    """
+    Device record returned by get_devices and get_connected_device
+
+    Declared with __slots__ so records carry no per-instance dict; both
+    orjson and Flask's JSON provider serialize dataclasses as objects.
+    """
+    __slots__ = ('path', 'address', 'name', 'alias', 'paired', 'connected', 'trusted')
+
+    path: str
+    address: str
+    name: str
+    alias: str
+    paired: bool
+    connected: bool
+    trusted: bool
+
+
+def _device_info(path, props) -> Device:
+    """Build the device record from unpacked Device1 properties"""
+    return Device(path, *(props.get(key, default) for _, key, _, default in DEVICE_FIELDS))
 
 
 class BluetoothManager:
@@ -23,38 +95,240 @@ class BluetoothManager:
         """Initialize Bluetooth manager with specified adapter"""
         self.adapter_name = adapter_name
         self.adapter_path = f"/org/bluez/{adapter_name}"
+
+        # Signals are queued on the GLib main context and dispatched by
+        # _dispatch_signals() whenever the cache is read
+        dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
         self.bus = dbus.SystemBus()
 
-    def _get_adapter(self):
-        """Get the Bluetooth adapter object"""
+        # Long-lived proxies, reused by every call instead of rebuilt per call
+        self._adapter_obj = self._get_object(self.adapter_path)
+        self._adapter_iface = dbus.Interface(self._adapter_obj, ADAPTER_INTERFACE)
+        self._adapter_props = dbus.Interface(self._adapter_obj, PROPERTIES_INTERFACE)
+        self._object_manager = dbus.Interface(self._get_object("/"), OBJECT_MANAGER_INTERFACE)
+        self._device_proxies = OrderedDict()
+
+        # Unpacked Device1 properties keyed by object path, kept current by BlueZ signals
+        self._devices: Dict[str, Dict] = {}
+        self._devices_loaded = False
+        # Unpacked Adapter1 properties, None until seeded by GetAll
+        self._adapter_cache: Optional[Dict] = None
+        self._lock = threading.RLock()
+
+        self.bus.add_signal_receiver(
+            self._on_interfaces_added,
+            signal_name="InterfacesAdded",
+            dbus_interface=OBJECT_MANAGER_INTERFACE,
+            bus_name=SERVICE_NAME,
+            path="/"
+        )
+        self.bus.add_signal_receiver(
+            self._on_interfaces_removed,
+            signal_name="InterfacesRemoved",
+            dbus_interface=OBJECT_MANAGER_INTERFACE,
+            bus_name=SERVICE_NAME,
+            path="/"
+        )
+        self.bus.add_signal_receiver(
+            self._on_properties_changed,
+            signal_name="PropertiesChanged",
+            dbus_interface=PROPERTIES_INTERFACE,
+            bus_name=SERVICE_NAME,
+            arg0=DEVICE_INTERFACE,
+            path_keyword="path"
+        )
+        self.bus.add_signal_receiver(
+            self._on_adapter_properties_changed,
+            signal_name="PropertiesChanged",
+            dbus_interface=PROPERTIES_INTERFACE,
+            bus_name=SERVICE_NAME,
+            arg0=ADAPTER_INTERFACE,
+            path=self.adapter_path
+        )
+        # bluetoothd drops its objects without signals when it restarts
         try:
-            adapter_obj = self.bus.get_object(SERVICE_NAME, self.adapter_path)
-            return dbus.Interface(adapter_obj, ADAPTER_INTERFACE)
-        except dbus.exceptions.DBusException as e:
-            logger.error(f"Failed to get adapter: {e}")
-            return None
+            self._bluez_owner = str(self.bus.get_name_owner(SERVICE_NAME))
+        except dbus.exceptions.DBusException:
+            self._bluez_owner = ''
+        self.bus.watch_name_owner(SERVICE_NAME, self._on_bluez_owner_changed)
 
-    def _get_adapter_properties(self):
-        """Get adapter properties"""
+        self._load_caches()
+
+    def _get_object(self, path):
+        """
+        Get a BlueZ proxy object without introspection
+
+        dbus-python otherwise issues an Introspect call before the first
+        method call on every new proxy; callers pass explicit signatures.
+        """
+        return self.bus.get_object(
+            SERVICE_NAME, path, introspect=False, follow_name_owner_changes=True
+        )
+
+    def _device_path(self, device_address: str) -> str:
+        """
+        Get the BlueZ object path for a Bluetooth MAC address
+
+        The path is taken from the device cache, and only built from the
+        address for devices BlueZ has not reported yet.
+        """
+        address = device_address.upper()
+        with self._lock:
+            for path, props in self._devices.items():
+                if props.get('Address', '').upper() == address:
+                    return path
+        return f"{self.adapter_path}/dev_{address.replace(':', '_')}"
+
+    def _device(self, device_path: str):
+        """
+        Get cached proxies for a device object path
+
+        Returns:
+            Tuple of (properties interface, device interface)
+        """
+        with self._lock:
+            proxies = self._device_proxies.get(device_path)
+            if proxies is not None:
+                self._device_proxies.move_to_end(device_path)
+                return proxies
+
+            device_obj = self._get_object(device_path)
+            proxies = (
+                dbus.Interface(device_obj, PROPERTIES_INTERFACE),
+                dbus.Interface(device_obj, DEVICE_INTERFACE)
+            )
+            self._device_proxies[device_path] = proxies
+            if len(self._device_proxies) > DEVICE_PROXY_CACHE_SIZE:
+                self._device_proxies.popitem(last=False)
+            return proxies
+
+    def _is_our_device(self, path) -> bool:
+        """Check whether an object path is a device under our adapter"""
+        return str(path).startswith(self.adapter_path + "/")
+
+    def _call_concurrently(self, calls):
+        """
+        Send several D-Bus method calls back to back and wait for every reply
+
+        Args:
+            calls: List of (proxy method, args tuple, kwargs dict)
+
+        Returns:
+            List of replies, in the same order as calls
+
+        Raises:
+            DBusException: The first error reply received
+        """
+        results = [None] * len(calls)
+        pending = [len(calls)]
+        errors = []
+
+        def handlers(index):
+            def on_reply(*reply):
+                results[index] = reply[0] if reply else None
+                pending[0] -= 1
+
+            def on_error(error):
+                errors.append(error)
+                pending[0] -= 1
+
+            return on_reply, on_error
+
+        context = GLib.MainContext.default()
+        with self._lock:
+            for index, (method, args, kwargs) in enumerate(calls):
+                on_reply, on_error = handlers(index)
+                method(*args, reply_handler=on_reply, error_handler=on_error,
+                       timeout=DBUS_CALL_TIMEOUT, **kwargs)
+            while pending[0]:
+                context.iteration(True)
+
+        if errors:
+            raise errors[0]
+        return results
+
+    def _load_caches(self):
+        """Seed the device and adapter caches, fetching both concurrently"""
         try:
-            adapter_obj = self.bus.get_object(SERVICE_NAME, self.adapter_path)
-            props = dbus.Interface(adapter_obj, PROPERTIES_INTERFACE)
-            return props.GetAll(ADAPTER_INTERFACE)
+            objects, adapter_props = self._call_concurrently([
+                (self._object_manager.GetManagedObjects, (), {}),
+                (self._adapter_props.GetAll, (ADAPTER_INTERFACE,), {})
+            ])
         except dbus.exceptions.DBusException as e:
-            logger.error(f"Failed to get adapter properties: {e}")
-            return {}
+            logger.error(f"Failed to load Bluetooth state: {e}")
+            return
+
+        with self._lock:
+            self._devices = {
+                str(path): _unpack(interfaces[DEVICE_INTERFACE], DEVICE_FIELDS)
+                for path, interfaces in objects.items()
+                if DEVICE_INTERFACE in interfaces and self._is_our_device(path)
+            }
+            self._devices_loaded = True
+            self._adapter_cache = _unpack(adapter_props, ADAPTER_FIELDS)
+
+    def _dispatch_signals(self):
+        """Run pending D-Bus signal handlers so the caches are current"""
+        context = GLib.MainContext.default()
+        with self._lock:
+            while context.pending():
+                context.iteration(False)
+            if not self._devices_loaded or self._adapter_cache is None:
+                self._load_caches()
+
+    def _on_adapter_properties_changed(self, interface, changed, invalidated):
+        """Merge Adapter1 property changes into the cache"""
+        with self._lock:
+            if self._adapter_cache is None:
+                return
+            self._adapter_cache.update(_unpack(changed, ADAPTER_FIELDS))
+            for name in invalidated:
+                self._adapter_cache.pop(name, None)
+
+    def _on_interfaces_added(self, path, interfaces):
+        """Add newly discovered or paired devices to the cache"""
+        if DEVICE_INTERFACE in interfaces and self._is_our_device(path):
+            with self._lock:
+                self._devices[str(path)] = _unpack(interfaces[DEVICE_INTERFACE], DEVICE_FIELDS)
+
+    def _on_interfaces_removed(self, path, interfaces):
+        """Drop removed devices from the cache"""
+        if DEVICE_INTERFACE in interfaces:
+            with self._lock:
+                self._devices.pop(str(path), None)
+
+    def _on_properties_changed(self, interface, changed, invalidated, path=None):
+        """Merge Device1 property changes into the cache"""
+        # Discovery floods RSSI/ManufacturerData updates that the cache never stores
+        if not invalidated and changed.keys() <= NOISY_DEVICE_PROPERTIES:
+            return
+        with self._lock:
+            props = self._devices.get(str(path))
+            if props is None:
+                return
+            props.update(_unpack(changed, DEVICE_FIELDS))
+            for name in invalidated:
+                props.pop(name, None)
+
+    def _on_bluez_owner_changed(self, owner):
+        """Reload the device cache when bluetoothd starts or stops"""
+        if owner == self._bluez_owner:
+            return
+        self._bluez_owner = owner
+        with self._lock:
+            self._devices = {}
+            self._devices_loaded = False
+            self._adapter_cache = None
+
+    def _get_adapter_properties(self):
+        """Get adapter properties from the signal-driven cache"""
+        self._dispatch_signals()
+        with self._lock:
+            return dict(self._adapter_cache or {})
 
     def get_adapter_info(self) -> Dict:
         """Get Bluetooth adapter information"""
-        props = self._get_adapter_properties()
-        return {
-            'name': str(props.get('Name', 'Unknown')),
-            'address': str(props.get('Address', 'Unknown')),
-            'powered': bool(props.get('Powered', False)),
-            'discoverable': bool(props.get('Discoverable', False)),
-            'pairable': bool(props.get('Pairable', False)),
-            'discovering': bool(props.get('Discovering', False))
-        }
+        return _adapter_info(self._get_adapter_properties())
 
     def set_discoverable(self, discoverable: bool, timeout: int = 0) -> bool:
         """
@@ -68,11 +342,13 @@ class BluetoothManager:
             True if successful, False otherwise
         """
         try:
-            adapter_obj = self.bus.get_object(SERVICE_NAME, self.adapter_path)
-            props = dbus.Interface(adapter_obj, PROPERTIES_INTERFACE)
-
-            props.Set(ADAPTER_INTERFACE, "Discoverable", dbus.Boolean(discoverable))
-            props.Set(ADAPTER_INTERFACE, "DiscoverableTimeout", dbus.UInt32(timeout))
+            # Sequential, timeout first: bluetoothd only applies a new
+            # DiscoverableTimeout to an adapter that is already discoverable,
+            # otherwise it uses the stored value when Discoverable is set
+            self._adapter_props.Set(ADAPTER_INTERFACE, "DiscoverableTimeout", dbus.UInt32(timeout),
+                                    signature='ssv', timeout=DBUS_CALL_TIMEOUT)
+            self._adapter_props.Set(ADAPTER_INTERFACE, "Discoverable", dbus.Boolean(discoverable),
+                                    signature='ssv', timeout=DBUS_CALL_TIMEOUT)
 
             logger.info(f"Discoverable mode set to {discoverable}")
             return True
@@ -83,46 +359,33 @@ class BluetoothManager:
     def set_pairable(self, pairable: bool) -> bool:
         """Set adapter pairable mode"""
         try:
-            adapter_obj = self.bus.get_object(SERVICE_NAME, self.adapter_path)
-            props = dbus.Interface(adapter_obj, PROPERTIES_INTERFACE)
-            props.Set(ADAPTER_INTERFACE, "Pairable", dbus.Boolean(pairable))
+            self._adapter_props.Set(ADAPTER_INTERFACE, "Pairable", dbus.Boolean(pairable), signature='ssv',
+                                    timeout=DBUS_CALL_TIMEOUT)
             logger.info(f"Pairable mode set to {pairable}")
             return True
         except dbus.exceptions.DBusException as e:
             logger.error(f"Failed to set pairable: {e}")
             return False
 
-    def get_devices(self) -> List[Dict]:
+    def get_devices(self) -> List[Device]:
         """Get list of paired and connected devices"""
-        devices = []
+        self._dispatch_signals()
+        with self._lock:
+            devices = [_device_info(path, props) for path, props in self._devices.items()]
+        logger.debug("Found %d devices", len(devices))
+        return devices
 
-        try:
-            manager_obj = self.bus.get_object(SERVICE_NAME, "/")
-            manager = dbus.Interface(manager_obj, "org.freedesktop.DBus.ObjectManager")
-            objects = manager.GetManagedObjects()
-
-            for path, interfaces in objects.items():
-                if DEVICE_INTERFACE in interfaces:
-                    device_props = interfaces[DEVICE_INTERFACE]
-
-                    # Only include devices for our adapter
-                    if str(path).startswith(self.adapter_path):
-                        devices.append({
-                            'path': str(path),
-                            'address': str(device_props.get('Address', 'Unknown')),
-                            'name': str(device_props.get('Name', 'Unknown')),
-                            'alias': str(device_props.get('Alias', 'Unknown')),
-                            'paired': bool(device_props.get('Paired', False)),
-                            'connected': bool(device_props.get('Connected', False)),
-                            'trusted': bool(device_props.get('Trusted', False))
-                        })
-
-            logger.info(f"Found {len(devices)} devices")
-            return devices
+    def get_status_snapshot(self) -> Tuple[Dict, Optional[Device]]:
+        """
+        Get adapter info and the connected device
 
-        except dbus.exceptions.DBusException as e:
-            logger.error(f"Failed to get devices: {e}")
-            return []
+        Both come from the signal-driven caches, so this normally makes
+        no D-Bus round trip at all.
+
+        Returns:
+            Tuple of (adapter info, connected device or None)
+        """
+        return self.get_adapter_info(), self.get_connected_device()
 
     def remove_device(self, device_address: str) -> bool:
         """
@@ -131,22 +394,31 @@ class BluetoothManager:
         Args:
             device_address: Bluetooth MAC address of device to remove
 
+        Returns:
+            True if successful, False otherwise
+        """
+        return self.remove_device_by_path(self._device_path(device_address))
+
+    def remove_device_by_path(self, device_path: str) -> bool:
+        """
+        Remove (unpair) a device by its BlueZ object path
+
+        Args:
+            device_path: Object path, as in Device.path
+
         Returns:
             True if successful, False otherwise
         """
         try:
-            # Convert address to object path
-            device_path = f"{self.adapter_path}/dev_{device_address.replace(':', '_')}"
-
-            adapter = self._get_adapter()
-            if adapter:
-                adapter.RemoveDevice(device_path)
-                logger.info(f"Removed device {device_address}")
-                return True
-            return False
+            self._adapter_iface.RemoveDevice(dbus.ObjectPath(device_path),
+                                             timeout=DBUS_CALL_TIMEOUT)
+            with self._lock:
+                self._device_proxies.pop(device_path, None)
+            logger.info(f"Removed device {device_path}")
+            return True
 
         except dbus.exceptions.DBusException as e:
-            logger.error(f"Failed to remove device {device_address}: {e}")
+            logger.error(f"Failed to remove device {device_path}: {e}")
             return False
 
     def trust_device(self, device_address: str) -> bool:
@@ -156,51 +428,74 @@ class BluetoothManager:
         Args:
             device_address: Bluetooth MAC address of device
 
+        Returns:
+            True if successful, False otherwise
+        """
+        return self.trust_device_by_path(self._device_path(device_address))
+
+    def trust_device_by_path(self, device_path: str) -> bool:
+        """
+        Trust a device by its BlueZ object path
+
+        Args:
+            device_path: Object path, as in Device.path
+
         Returns:
             True if successful, False otherwise
         """
         try:
-            device_path = f"{self.adapter_path}/dev_{device_address.replace(':', '_')}"
-            device_obj = self.bus.get_object(SERVICE_NAME, device_path)
-            props = dbus.Interface(device_obj, PROPERTIES_INTERFACE)
-            props.Set(DEVICE_INTERFACE, "Trusted", dbus.Boolean(True))
-            logger.info(f"Trusted device {device_address}")
+            props, _ = self._device(device_path)
+            props.Set(DEVICE_INTERFACE, "Trusted", dbus.Boolean(True), signature='ssv',
+                      timeout=DBUS_CALL_TIMEOUT)
+            logger.info(f"Trusted device {device_path}")
             return True
 
         except dbus.exceptions.DBusException as e:
-            logger.error(f"Failed to trust device {device_address}: {e}")
+            logger.error(f"Failed to trust device {device_path}: {e}")
             return False
 
-    def get_connected_device(self) -> Optional[Dict]:
+    def get_connected_device(self) -> Optional[Device]:
         """Get currently connected device (if any)"""
-        devices = self.get_devices()
-        for device in devices:
-            if device['connected']:
-                return device
-        return None
+        self._dispatch_signals()
+        with self._lock:
+            return next(
+                (_device_info(path, props) for path, props in self._devices.items()
+                 if props.get('Connected')),
+                None
+            )
 
     def start_discovery(self) -> bool:
-        """Start device discovery"""
+        """
+        Start device discovery
+
+        The call is sent without waiting for BlueZ; failures are logged
+        when the reply is dispatched.
+        """
         try:
-            adapter = self._get_adapter()
-            if adapter:
-                adapter.StartDiscovery()
-                logger.info("Started discovery")
-                return True
-            return False
+            self._adapter_iface.StartDiscovery(
+                reply_handler=lambda: logger.info("Started discovery"),
+                error_handler=lambda e: logger.error(f"Failed to start discovery: {e}"),
+                timeout=DBUS_CALL_TIMEOUT
+            )
+            return True
         except dbus.exceptions.DBusException as e:
             logger.error(f"Failed to start discovery: {e}")
             return False
 
     def stop_discovery(self) -> bool:
-        """Stop device discovery"""
+        """
+        Stop device discovery
+
+        The call is sent without waiting for BlueZ; failures are logged
+        when the reply is dispatched.
+        """
         try:
-            adapter = self._get_adapter()
-            if adapter:
-                adapter.StopDiscovery()
-                logger.info("Stopped discovery")
-                return True
-            return False
+            self._adapter_iface.StopDiscovery(
+                reply_handler=lambda: logger.info("Stopped discovery"),
+                error_handler=lambda e: logger.error(f"Failed to stop discovery: {e}"),
+                timeout=DBUS_CALL_TIMEOUT
+            )
+            return True
         except dbus.exceptions.DBusException as e:
             logger.error(f"Failed to stop discovery: {e}")
             return False
@@ -217,4 +512,4 @@ if __name__ == "__main__":
 
     print("\nDevices:")
     for device in manager.get_devices():
-        print(f"  - {device['name']} ({device['address']}) - Connected: {device['connected']}")
+        print(f"  - {device.name} ({device.address}) - Connected: {device.connected}")
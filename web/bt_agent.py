@@ -9,6 +9,8 @@ import dbus.service
 import dbus.mainloop.glib
 from gi.repository import GLib
 import logging
+import logging.handlers
+import queue
 
 logging.basicConfig(
     level=logging.INFO,
@@ -21,6 +23,24 @@ AGENT_INTERFACE = "org.bluez.Agent1"
 AGENT_PATH = "/org/bluez/AutoPairAgent"
 
 
+def start_log_listener():
+    """
+    Move log output off the D-Bus dispatch thread
+
+    Records are put on a queue and written by a QueueListener thread, so a
+    slow journald never delays the agent's replies to BlueZ.
+
+    Returns:
+        The started QueueListener; stop() it to flush on shutdown
+    """
+    root = logging.getLogger()
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    listener.start()
+    return listener
+
+
 class AutoPairAgent(dbus.service.Object):
     """
     Bluetooth Agent that automatically accepts all pairing requests
@@ -32,11 +52,15 @@ class AutoPairAgent(dbus.service.Object):
         self.recently_paired = set()
         logger.info("Bluetooth Auto-Pair Agent initialized")
 
-        # Listen for device property changes to detect successful connections
+        # Listen for device property changes to detect successful connections.
+        # bus_name and arg0 go into the AddMatch rule, so the bus daemon only
+        # wakes us for BlueZ Device1 changes, not every PropertiesChanged.
         self.bus.add_signal_receiver(
             self.on_device_property_changed,
             signal_name="PropertiesChanged",
             dbus_interface="org.freedesktop.DBus.Properties",
+            bus_name=SERVICE_NAME,
+            arg0="org.bluez.Device1",
             path_keyword="path"
         )
 
@@ -45,11 +69,12 @@ class AutoPairAgent(dbus.service.Object):
         """Called when agent is unregistered"""
         logger.info("Agent released")
 
-    @dbus.service.method(AGENT_INTERFACE, in_signature="os", out_signature="")
-    def AuthorizeService(self, device, uuid):
+    @dbus.service.method(AGENT_INTERFACE, in_signature="os", out_signature="",
+                         async_callbacks=("reply_cb", "error_cb"))
+    def AuthorizeService(self, device, uuid, reply_cb, error_cb):
         """Authorize a service request"""
+        reply_cb()
         logger.info(f"Authorizing service {uuid} for device {device}")
-        return
 
     @dbus.service.method(AGENT_INTERFACE, in_signature="o", out_signature="s")
     def RequestPinCode(self, device):
@@ -73,17 +98,20 @@ class AutoPairAgent(dbus.service.Object):
         """Display PIN code (not used for auto-pairing)"""
         logger.info(f"Display PIN {pincode} for {device}")
 
-    @dbus.service.method(AGENT_INTERFACE, in_signature="ou", out_signature="")
-    def RequestConfirmation(self, device, passkey):
+    @dbus.service.method(AGENT_INTERFACE, in_signature="ou", out_signature="",
+                         async_callbacks=("reply_cb", "error_cb"))
+    def RequestConfirmation(self, device, passkey, reply_cb, error_cb):
         """Auto-confirm pairing requests"""
+        # Reply before logging so BlueZ can continue pairing straight away
+        reply_cb()
         logger.info(f"Auto-confirming pairing for {device} with passkey {passkey}")
-        return
 
-    @dbus.service.method(AGENT_INTERFACE, in_signature="o", out_signature="")
-    def RequestAuthorization(self, device):
+    @dbus.service.method(AGENT_INTERFACE, in_signature="o", out_signature="",
+                         async_callbacks=("reply_cb", "error_cb"))
+    def RequestAuthorization(self, device, reply_cb, error_cb):
         """Auto-authorize connection requests"""
+        reply_cb()
         logger.info(f"Auto-authorizing {device}")
-        return
 
     @dbus.service.method(AGENT_INTERFACE, in_signature="", out_signature="")
     def Cancel(self):
@@ -132,6 +160,8 @@ class AutoPairAgent(dbus.service.Object):
 
 def main():
     """Main function to run the Bluetooth agent"""
+    log_listener = start_log_listener()
+
     dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
 
     bus = dbus.SystemBus()
@@ -147,6 +177,7 @@ def main():
         logger.info("Agent registered and set as default")
     except Exception as e:
         logger.error(f"Failed to register agent: {e}")
+        log_listener.stop()
         return
 
     # Run the main loop
@@ -164,6 +195,7 @@ def main():
             logger.info("Agent unregistered")
         except:
             pass
+        log_listener.stop()
 
 
 if __name__ == "__main__":
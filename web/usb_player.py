@@ -4,23 +4,47 @@ Local Music Player for RPI Bluetooth Audio Receiver
 Plays music from local SD card storage
 """
 
+import atexit
 import os
 import time
+import socket
 import subprocess
 import threading
 import logging
-from pathlib import Path
 import json
+import marshal
 import random
+import select
+import signal
+import dbus
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:
+    INotify = None
+
+try:
+    from gevent import get_hub
+    from gevent.monkey import is_module_patched
+except ImportError:
+    get_hub = None
 
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%H:%M:%S'
 )
 logger = logging.getLogger('MusicPlayer')
 
 # Supported audio formats
-AUDIO_EXTENSIONS = {'.mp3', '.flac', '.wav', '.m4a', '.aac', '.ogg', '.opus', '.wma'}
+AUDIO_EXTENSIONS = frozenset({'.mp3', '.flac', '.wav', '.m4a', '.aac', '.ogg', '.opus', '.wma'})
+# Lower- and upper-case suffixes for str.endswith; mixed case falls back to lower()
+AUDIO_SUFFIX_TUPLE = tuple(e for ext in AUDIO_EXTENSIONS for e in (ext, ext.upper()))
 
 # Local music directory
 MUSIC_DIR = '/var/music'
@@ -28,200 +52,591 @@ MUSIC_DIR = '/var/music'
 # State file
 STATE_FILE = '/var/lib/bluetooth-receiver/music_player_state.json'
 
+# Long-lived mpv player, controlled over its JSON IPC socket
+MPV_SOCKET = f'/run/bluetooth-receiver/mpv-{os.getpid()}.sock'
+MPV_COMMAND = (
+    'mpv', '--idle=yes', '--no-video', '--no-terminal',
+    '--ao=alsa', '--audio-device=alsa/plughw:Headphones',
+    f'--input-ipc-server={MPV_SOCKET}'
+)
+MPV_STARTUP_TIMEOUT = 5  # seconds
+MPV_PLAYLIST_FILE = f'/run/bluetooth-receiver/playlist-{os.getpid()}.m3u'
+
+# systemd D-Bus API, used to stop/start BlueALSA playback without forking systemctl
+SYSTEMD_SERVICE = 'org.freedesktop.systemd1'
+SYSTEMD_PATH = '/org/freedesktop/systemd1'
+SYSTEMD_MANAGER_INTERFACE = 'org.freedesktop.systemd1.Manager'
+BLUEALSA_APLAY_UNIT = 'bluealsa-aplay.service'
+
+# BlueZ AVRCP media players, paused instead of stopping bluealsa-aplay
+BLUEZ_SERVICE = 'org.bluez'
+OBJECT_MANAGER_INTERFACE = 'org.freedesktop.DBus.ObjectManager'
+MEDIA_PLAYER_INTERFACE = 'org.bluez.MediaPlayer1'
+
+# Scanned library, reused while no directory under MUSIC_DIR has changed.
+# Stored with msgpack when installed, otherwise marshal; both load far
+# faster than json. The file is private to this host and Python version.
+LIBRARY_CACHE_FILE = os.path.join(
+    os.path.dirname(STATE_FILE),
+    'music_library.msgpack' if msgpack is not None else 'music_library.marshal'
+)
+
+# Seconds to keep collecting inotify events before acting on a change,
+# so copying an album triggers one rescan instead of one per file
+LIBRARY_WATCH_DELAY = 0.5
+
+# Filesystem bookkeeping directories that never hold music; hidden (.*)
+# directories such as .Spotlight-V100 and .Trashes are skipped as well
+SKIP_DIRECTORIES = frozenset({'System Volume Information', '$RECYCLE.BIN', 'found.000', 'lost+found'})
+
+
+def _walk_music(root):
+    """
+    Recursively yield audio file paths under root using os.scandir
+
+    Each directory's entries are sorted case-insensitively before use, so
+    paths come out in alphabetical depth-first order without a global sort.
+    """
+    try:
+        it = os.scandir(root)
+    except PermissionError as e:
+        # Skip unreadable directories instead of abandoning the whole scan
+        logger.warning(f"Skipping {root}: {e}")
+        return
+    # The directory handle is closed before recursing into subdirectories
+    with it:
+        entries = sorted(it, key=lambda entry: entry.name.lower())
+    for entry in entries:
+        name = entry.name
+        # Skip hidden files/directories and Mac resource forks (._*)
+        if name[0] == '.':
+            continue
+        # follow_symlinks=False lets DirEntry answer from the d_type
+        # returned by the directory read, without a stat() per entry
+        if entry.is_dir(follow_symlinks=False):
+            if name not in SKIP_DIRECTORIES:
+                yield from _walk_music(entry.path)
+        elif ((name.endswith(AUDIO_SUFFIX_TUPLE) or name.lower().endswith(AUDIO_SUFFIX_TUPLE))
+              and entry.is_file(follow_symlinks=False)):
+            yield entry.path
+
+
+def _off_hub(func, *args):
+    """
+    Run a blocking filesystem walk without stalling gevent
+
+    Inside the gevent-patched web app, threads are greenlets and scandir()
+    and stat() never yield, so the walk would block every request. There it
+    runs on gevent's native threadpool; elsewhere it is simply called.
+    """
+    if get_hub is not None and is_module_patched('threading'):
+        return get_hub().threadpool.apply(func, args)
+    return func(*args)
+
+
+def _collect_music(root):
+    """List every audio file path under root"""
+    return list(_walk_music(root))
+
+
+def _directory_signature(root):
+    """Map every directory _walk_music descends into to its mtime in nanoseconds"""
+    signature = {root: os.stat(root).st_mtime_ns}
+    pending = [root]
+    while pending:
+        try:
+            it = os.scandir(pending.pop())
+        except PermissionError:
+            # _walk_music skips it too
+            continue
+        with it:
+            for entry in it:
+                name = entry.name
+                if (name[0] != '.' and name not in SKIP_DIRECTORIES
+                        and entry.is_dir(follow_symlinks=False)):
+                    signature[entry.path] = entry.stat(follow_symlinks=False).st_mtime_ns
+                    pending.append(entry.path)
+    return signature
+
+
+def _load_library_cache(signature):
+    """Return the cached file list if it was built for this signature"""
+    try:
+        with open(LIBRARY_CACHE_FILE, 'rb') as f:
+            data = f.read()
+        if msgpack is not None:
+            cache = msgpack.unpackb(data, raw=False, unicode_errors='surrogateescape')
+        else:
+            cache = marshal.loads(data)
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+    if not isinstance(cache, dict) or cache.get('signature') != signature:
+        return None
+    files = cache.get('files')
+    if not isinstance(files, str):
+        return None
+    # Paths are stored as one NUL-separated string: one decode and a C-level split
+    return files.split('\0') if files else []
+
+
+def _save_library_cache(signature, files):
+    """Atomically write the scanned file list and its directory signature"""
+    # The web app and usb-player.service both scan at boot; a per-process
+    # temp name keeps concurrent writers from truncating each other's file
+    tmp_path = f'{LIBRARY_CACHE_FILE}.{os.getpid()}.tmp'
+    try:
+        cache = {'signature': signature, 'files': '\0'.join(files)}
+        if msgpack is not None:
+            # Surrogate-escaped (non-UTF-8) file names round-trip as their raw bytes
+            data = msgpack.packb(cache, use_bin_type=True, unicode_errors='surrogateescape')
+        else:
+            data = marshal.dumps(cache)
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, LIBRARY_CACHE_FILE)
+    except (OSError, ValueError) as e:
+        # Never let a cache failure discard a successful scan
+        logger.warning(f"Could not write library cache: {e}")
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
 
 class LocalMusicPlayer:
     """Manages local music playback from SD card"""
 
     def __init__(self):
-        self.current_process = None
-        self.playlist = []
+        self.mpv_process = None
+        self.mpv_socket = None
+        self.ipc_lock = threading.Lock()
+        # mpv is a separate process; stop it when this interpreter exits
+        atexit.register(self.close)
+        # Library in alphabetical order, its display names (basenames), and
+        # the play order as indexes into both
+        self._files = []
+        self._names = []
+        self._order = []
         self.current_index = 0
+        # mpv's playlist is the play order rotated left by this many entries
+        self.mpv_offset = 0
+        # Set once mpv reports a track from the playlist loaded by start_playback
+        self.mpv_started = False
         self.is_playing = False
         self.is_paused = False
         self.shuffle = False
         self.loop = True
+        # self.lock guards player state only and is never held across mpv IPC,
+        # file or D-Bus I/O, so the mpv event reader can always take it.
+        # command_lock serializes the commands that rebuild mpv's playlist.
         self.lock = threading.Lock()
+        self.command_lock = threading.Lock()
+        # Status dict for get_status, replaced whole by _publish_status
+        self._status = None
+        self._publish_status()
+        self.systemd = self._get_systemd_manager()
+        # Object paths of the Bluetooth media players paused by pause_bluetooth
+        self.paused_players = []
+        # Set when pause_bluetooth had to fall back to stopping bluealsa-aplay
+        self.bluealsa_stopped = False
 
         # Ensure state and music directories exist
         os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
         os.makedirs(MUSIC_DIR, exist_ok=True)
 
-        # Load music library on startup
-        self.scan_music_library()
+        # Set by the inotify watcher when MUSIC_DIR changes during playback
+        self.library_dirty = False
 
-        logger.info(f"Local Music Player initialized with {len(self.playlist)} tracks")
+        # Load music library in the background so the web app starts serving
+        # at once; start_playback waits on command_lock until it is done
+        self.library_watch = None
+        self.command_lock.acquire()
+        threading.Thread(target=self._load_library, daemon=True).start()
+
+    def _load_library(self):
+        """Scan the music library and start watching it, holding command_lock"""
+        try:
+            self.scan_music_library()
+            self.library_watch = self._start_library_watch()
+        finally:
+            self.command_lock.release()
+        logger.info(f"Local Music Player initialized with {len(self._files)} tracks")
 
     def scan_music_library(self):
         """Scan local music directory for audio files"""
         logger.info(f"Scanning {MUSIC_DIR} for music files...")
         music_files = []
+        # Cleared before scanning so changes made during the scan mark it again
+        self.library_dirty = False
 
         try:
-            if not os.path.exists(MUSIC_DIR):
-                logger.warning(f"Music directory {MUSIC_DIR} does not exist")
-                return []
-
-            for root, dirs, files in os.walk(MUSIC_DIR):
-                for file in files:
-                    # Skip hidden files and Mac resource forks
-                    if file.startswith('.') or file.startswith('._'):
-                        continue
-                    if Path(file).suffix.lower() in AUDIO_EXTENSIONS:
-                        full_path = os.path.join(root, file)
-                        music_files.append(full_path)
+            # Directory mtimes change whenever files are added, removed or renamed.
+            # Its stat of MUSIC_DIR doubles as the existence check.
+            signature = _off_hub(_directory_signature, MUSIC_DIR)
+        except FileNotFoundError:
+            logger.warning(f"Music directory {MUSIC_DIR} does not exist")
+            return []
+        except Exception as e:
+            logger.error(f"Error scanning music library: {e}")
+            return []
+
+        try:
+            music_files = _load_library_cache(signature)
+            if music_files is not None:
+                self._set_library(music_files)
+                logger.info(f"Loaded {len(music_files)} music files from cache")
+                return music_files
 
-            # Sort files alphabetically (case-insensitive)
-            music_files.sort(key=lambda x: x.lower())
+            # Already in alphabetical order (case-insensitive), directory by directory
+            music_files = _off_hub(_collect_music, MUSIC_DIR)
+            _save_library_cache(signature, music_files)
 
-            self.playlist = music_files
+            self._set_library(music_files)
             logger.info(f"Found {len(music_files)} music files")
             return music_files
         except Exception as e:
             logger.error(f"Error scanning music library: {e}")
             return []
 
-    def toggle_shuffle(self):
-        """Toggle shuffle mode"""
-        with self.lock:
-            self.shuffle = not self.shuffle
-            if self.shuffle:
-                # Save current track
-                current_track = self.playlist[self.current_index] if self.current_index < len(self.playlist) else None
-                # Shuffle playlist
-                random.shuffle(self.playlist)
-                # Find current track in shuffled playlist
-                if current_track:
-                    try:
-                        self.current_index = self.playlist.index(current_track)
-                    except ValueError:
-                        self.current_index = 0
-                logger.info("Shuffle enabled")
-            else:
-                # Restore alphabetical order
-                self.scan_music_library()
-                logger.info("Shuffle disabled")
-            return self.shuffle
+    def _start_library_watch(self):
+        """
+        Watch every directory under MUSIC_DIR with inotify
+
+        Returns:
+            The INotify instance, or None if changes cannot be watched and
+            start_playback has to rescan every time
+        """
+        if INotify is None:
+            return None
 
-    def play_file(self, file_path):
-        """Play a single audio file using mpg123 or similar"""
         try:
-            logger.info(f"Playing: {os.path.basename(file_path)}")
+            inotify = INotify()
+            watches = {}
+            self._add_library_watches(inotify, watches, MUSIC_DIR)
+        except OSError as e:
+            logger.warning(f"Cannot watch {MUSIC_DIR} for changes: {e}")
+            return None
+
+        threading.Thread(target=self._watch_library, args=(inotify, watches), daemon=True).start()
+        return inotify
+
+    def _add_library_watches(self, inotify, watches, root):
+        """Add an inotify watch on root and each directory below it"""
+        mask = (inotify_flags.CREATE | inotify_flags.DELETE |
+                inotify_flags.MOVED_TO | inotify_flags.MOVED_FROM)
+        for path in _off_hub(_directory_signature, root):
+            watches[inotify.add_watch(path, mask)] = path
+
+    def _watch_library(self, inotify, watches):
+        """Rescan the library when files are added, removed or renamed"""
+        while True:
+            # select() rather than a blocking read, so gevent can switch
+            # greenlets while the player runs inside the web app
+            select.select([inotify], [], [])
+            time.sleep(LIBRARY_WATCH_DELAY)
+            events = inotify.read(timeout=0)
+
+            for event in events:
+                if event.mask & inotify_flags.IGNORED:
+                    # Watched directory was deleted
+                    watches.pop(event.wd, None)
+                elif (event.mask & inotify_flags.ISDIR and
+                      event.mask & (inotify_flags.CREATE | inotify_flags.MOVED_TO) and
+                      event.wd in watches):
+                    try:
+                        self._add_library_watches(inotify, watches, os.path.join(watches[event.wd], event.name))
+                    except OSError as e:
+                        logger.warning(f"Cannot watch new directory {event.name}: {e}")
+
+            # IN_Q_OVERFLOW means events were lost; a full rescan covers that too
+            self.library_dirty = True
+            with self.command_lock:
+                # Rescanning resets the play order, so wait for playback to stop
+                if not self.is_playing:
+                    self.scan_music_library()
+
+    def _set_library(self, files):
+        """Replace the library and reset the play order to alphabetical"""
+        order = list(range(len(files)))
+        names = [path[path.rfind('/') + 1:] for path in files]
+        with self.lock:
+            self._files = files
+            self._names = names
+            self._order = order
+            self.current_index = 0
+            self._publish_status()
 
-            # Try mpg123 first (best for MP3), then ffplay (supports everything)
-            # Use aplay with sox for format conversion if needed
-            ext = Path(file_path).suffix.lower()
+    def _playlist(self):
+        """Library files in play order"""
+        files = self._files
+        return [files[i] for i in self._order]
 
-            if ext == '.mp3':
-                # Use mpg123 for MP3 with ALSA output to hardware device
-                cmd = ['mpg123', '-q', '-o', 'alsa', '-a', 'plughw:Headphones', file_path]
+    def toggle_shuffle(self):
+        """Toggle shuffle mode"""
+        with self.command_lock:
+            with self.lock:
+                previous = (self.shuffle, self._order, self.current_index, self.mpv_offset)
+                shuffle, rotation = self._toggle_shuffle_order()
+                self._publish_status()
+            if rotation is not None:
+                try:
+                    self._reorder_mpv_playlist(rotation)
+                except OSError as e:
+                    # mpv still has the old playlist, so keep the state that matches it
+                    logger.error(f"Could not write mpv playlist: {e}")
+                    with self.lock:
+                        self.shuffle, self._order, self.current_index, self.mpv_offset = previous
+                        self._publish_status()
+                    return self.shuffle
+            return shuffle
+
+    def _toggle_shuffle_order(self):
+        """
+        Flip shuffle and reorder the play order around the current track
+
+        Called with self.lock held. Returns the new shuffle state and, while
+        playing, the rotated playlist to hand to mpv.
+        """
+        self.shuffle = not self.shuffle
+        # Save current track
+        current_track = self._order[self.current_index] if self.current_index < len(self._order) else None
+        count = len(self._files)
+        if self.shuffle:
+            # Shuffle play order only; the library stays sorted
+            self._order = random.sample(range(count), k=count)
+            logger.info("Shuffle enabled")
+        else:
+            # Restore alphabetical order
+            self._order = list(range(count))
+            logger.info("Shuffle disabled")
+
+        # Find current track in the reordered playlist
+        if current_track is not None:
+            if self.shuffle:
+                # C-level scan over ints, no path string compares
+                self.current_index = self._order.index(current_track)
             else:
-                # Use ffplay for other formats (from ffmpeg)
-                # -nodisp: no display, -autoexit: exit when done, -loglevel quiet
-                cmd = ['ffplay', '-nodisp', '-autoexit', '-loglevel', 'quiet', file_path]
+                # Alphabetical order is the identity permutation
+                self.current_index = current_track
+
+        if not self.is_playing:
+            return self.shuffle, None
+
+        # mpv's playlist becomes the play order rotated to start at the current track
+        index = self.current_index
+        playlist = self._playlist()
+        self.mpv_offset = index
+        return self.shuffle, playlist[index + 1:] + playlist[:index]
+
+    def _write_mpv_playlist(self, files):
+        """Write files to the m3u playlist that mpv loads"""
+        # surrogateescape writes back the raw bytes of non-UTF-8 file names
+        with open(MPV_PLAYLIST_FILE, 'w', encoding='utf-8', errors='surrogateescape') as f:
+            f.write('\n'.join(files))
+            f.write('\n')
+
+    def _reorder_mpv_playlist(self, rotation):
+        """
+        Give mpv the new playlist order without interrupting the current track
+
+        playlist-clear keeps only the playing entry, so the remaining tracks
+        of the rotation are appended after it.
+        """
+        self._write_mpv_playlist(rotation)
+        self._send_mpv('playlist-clear')
+        self._send_mpv('loadlist', MPV_PLAYLIST_FILE, 'append')
+
+    def _ensure_mpv(self):
+        """Start mpv and connect to its IPC socket if it is not running"""
+        if self.mpv_process and self.mpv_process.poll() is None and self.mpv_socket:
+            return True
+
+        # Never leave a previous mpv holding the ALSA device behind
+        self._close_mpv_socket()
+        self._stop_mpv_process()
 
-            self.current_process = subprocess.Popen(
-                cmd,
+        try:
+            os.makedirs(os.path.dirname(MPV_SOCKET), exist_ok=True)
+            self.mpv_process = subprocess.Popen(
+                MPV_COMMAND,
                 stdout=subprocess.DEVNULL,
                 stderr=subprocess.DEVNULL
             )
-
-            # Wait for playback to finish
-            self.current_process.wait()
-
-            return self.current_process.returncode == 0
-
         except FileNotFoundError:
-            logger.error(f"Player not found. Install mpg123 or ffmpeg")
-            return False
-        except Exception as e:
-            logger.error(f"Error playing file: {e}")
+            logger.error("Player not found. Install mpv")
             return False
 
-    def playback_loop(self):
-        """Main playback loop"""
-        while self.is_playing:
-            with self.lock:
-                if not self.playlist:
-                    logger.info("Playlist empty, stopping")
-                    self.is_playing = False
-                    break
-
-                if self.current_index >= len(self.playlist):
-                    if self.loop:
-                        logger.info("Reached end of playlist, looping...")
-                        # Reshuffle if shuffle mode is enabled
-                        if self.shuffle:
-                            random.shuffle(self.playlist)
-                            logger.info("Playlist reshuffled for next loop")
-                        self.current_index = 0
-                    else:
-                        logger.info("Reached end of playlist, stopping")
-                        self.is_playing = False
-                        break
-
-                current_file = self.playlist[self.current_index]
-
-            # Play the file (outside lock to allow control operations)
-            success = self.play_file(current_file)
-
-            if success:
-                with self.lock:
-                    self.current_index += 1
-            else:
-                # Skip to next file on error
-                logger.warning(f"Failed to play file, skipping")
-                with self.lock:
-                    self.current_index += 1
+        # mpv creates the socket shortly after starting
+        deadline = time.monotonic() + MPV_STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(MPV_SOCKET)
+            except OSError:
+                sock.close()
+                time.sleep(0.05)
+                continue
+            self.mpv_socket = sock
+            threading.Thread(target=self._read_mpv_events, args=(sock,), daemon=True).start()
+            self._send_mpv('observe_property', 1, 'playlist-pos')
+            logger.info("mpv player started")
+            return True
+
+        logger.error("mpv did not open its IPC socket")
+        self._stop_mpv_process()
+        return False
+
+    def _close_mpv_socket(self):
+        """Disconnect from mpv's IPC socket, ending the event reader thread"""
+        with self.ipc_lock:
+            sock, self.mpv_socket = self.mpv_socket, None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
+    def _stop_mpv_process(self):
+        """Terminate mpv if it is running and reap it"""
+        process, self.mpv_process = self.mpv_process, None
+        if process is None:
+            return
+        if process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+    def close(self):
+        """Terminate mpv and remove its socket and playlist files"""
+        # Cleared first so the reader thread sees a normal shutdown, not a crash
+        with self.lock:
+            if self.is_playing:
+                self.is_playing = False
+                self._publish_status()
+        self._close_mpv_socket()
+        self._stop_mpv_process()
+        for path in (MPV_SOCKET, MPV_PLAYLIST_FILE):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def _send_mpv(self, *command):
+        """Send a command to mpv over its IPC socket"""
+        message = json.dumps({'command': list(command)}).encode() + b'\n'
+        with self.ipc_lock:
+            if not self.mpv_socket:
+                return False
+            try:
+                self.mpv_socket.sendall(message)
+                return True
+            except OSError as e:
+                logger.error(f"Error sending command to mpv: {e}")
+                return False
 
-        logger.info("Playback loop ended")
+    def _read_mpv_events(self, sock):
+        """Track mpv's playlist position from its IPC property-change events"""
+        try:
+            with sock.makefile('rb') as stream:
+                for line in stream:
+                    try:
+                        message = json.loads(line)
+                    except ValueError:
+                        continue
+                    if message.get('event') == 'property-change' and message.get('name') == 'playlist-pos':
+                        self._on_playlist_pos(message.get('data'))
+        except OSError:
+            pass
+
+        # mpv exited or the socket closed
+        with self.ipc_lock:
+            if self.mpv_socket is sock:
+                self.mpv_socket = None
+        with self.lock:
+            if self.is_playing:
+                logger.error("mpv exited during playback")
+                self.is_playing = False
+                self._publish_status()
+
+    def _on_playlist_pos(self, pos):
+        """Update the current track when mpv moves through its playlist"""
+        with self.lock:
+            if not self.is_playing or pos is None:
+                return
+            if pos < 0:
+                # Ignore the idle position reported before our playlist loads
+                if self.mpv_started:
+                    # mpv went idle: end of playlist with looping disabled
+                    logger.info("Reached end of playlist, stopping")
+                    self.is_playing = False
+                    self._publish_status()
+                return
+            self.mpv_started = True
+            self.current_index = (pos + self.mpv_offset) % len(self._order)
+            self._publish_status()
+            logger.info(f"Playing: {self._names[self._order[self.current_index]]}")
 
     def start_playback(self):
         """Start music playback"""
-        with self.lock:
+        with self.command_lock:
             if self.is_playing:
                 logger.warning("Already playing")
                 return False
 
-            # Rescan music library
-            self.scan_music_library()
+            # Without inotify there is no way to tell whether the library changed
+            if self.library_dirty or self.library_watch is None:
+                self.scan_music_library()
 
-            if not self.playlist:
+            if not self._files:
                 logger.warning("No music files found in library")
                 return False
 
-            # Apply shuffle if enabled
-            if self.shuffle:
-                random.shuffle(self.playlist)
-                logger.info("Playlist shuffled for playback")
+            if not self._ensure_mpv():
+                return False
 
-            self.current_index = 0
-            self.is_playing = True
+            with self.lock:
+                # Apply shuffle if enabled
+                if self.shuffle:
+                    count = len(self._files)
+                    self._order = random.sample(range(count), k=count)
+                    logger.info("Playlist shuffled for playback")
+                playlist = self._playlist()
+
+            # Written before any state changes, so a failure leaves the player stopped
+            try:
+                self._write_mpv_playlist(playlist)
+            except OSError as e:
+                logger.error(f"Could not write mpv playlist: {e}")
+                return False
+
+            with self.lock:
+                self.current_index = 0
+                self.mpv_offset = 0
+                self.mpv_started = False
+                self.is_playing = True
+                self._publish_status()
 
             # Stop BlueALSA playback to avoid conflicts
             self.pause_bluetooth()
 
-        # Start playback in background thread
-        playback_thread = threading.Thread(target=self.playback_loop, daemon=True)
-        playback_thread.start()
+            # mpv owns playback order, looping and track changes from here on
+            self._send_mpv('set_property', 'loop-playlist', 'inf' if self.loop else 'no')
+            self._send_mpv('loadlist', MPV_PLAYLIST_FILE, 'replace')
 
-        logger.info(f"Started playback of {len(self.playlist)} files")
+        logger.info(f"Started playback of {len(self._files)} files")
         return True
 
     def stop_playback(self):
         """Stop USB music playback"""
-        with self.lock:
-            self.is_playing = False
-
-            if self.current_process:
-                try:
-                    self.current_process.terminate()
-                    self.current_process.wait(timeout=2)
-                except:
-                    try:
-                        self.current_process.kill()
-                    except:
-                        pass
-                self.current_process = None
+        with self.command_lock:
+            with self.lock:
+                self.is_playing = False
+                self._publish_status()
+            self._send_mpv('stop')
 
         # Resume Bluetooth
         self.resume_bluetooth()
@@ -230,44 +645,109 @@ class LocalMusicPlayer:
 
     def next_track(self):
         """Skip to next track"""
-        with self.lock:
-            if not self.is_playing:
-                return False
+        if not self.is_playing:
+            return False
 
-            if self.current_process:
-                try:
-                    self.current_process.terminate()
-                except:
-                    pass
+        self._send_mpv('playlist-next')
 
         logger.info("Skipping to next track")
         return True
 
     def previous_track(self):
         """Go to previous track"""
-        with self.lock:
-            if not self.is_playing:
-                return False
-
-            self.current_index = max(0, self.current_index - 2)
+        if not self.is_playing:
+            return False
 
-            if self.current_process:
-                try:
-                    self.current_process.terminate()
-                except:
-                    pass
+        self._send_mpv('playlist-prev')
 
         logger.info("Going to previous track")
         return True
 
+    def _get_systemd_manager(self):
+        """Get the systemd Manager interface, or None if D-Bus is unavailable"""
+        try:
+            obj = dbus.SystemBus().get_object(SYSTEMD_SERVICE, SYSTEMD_PATH, introspect=False)
+            return dbus.Interface(obj, SYSTEMD_MANAGER_INTERFACE)
+        except dbus.exceptions.DBusException as e:
+            logger.warning(f"systemd D-Bus API unavailable, using systemctl: {e}")
+            return None
+
+    def _get_media_players(self):
+        """Return {path: properties} for every BlueZ MediaPlayer1 object"""
+        obj = dbus.SystemBus().get_object(BLUEZ_SERVICE, '/', introspect=False)
+        objects = dbus.Interface(obj, OBJECT_MANAGER_INTERFACE).GetManagedObjects(timeout=5)
+        return {
+            str(path): interfaces[MEDIA_PLAYER_INTERFACE]
+            for path, interfaces in objects.items()
+            if MEDIA_PLAYER_INTERFACE in interfaces
+        }
+
+    def _media_player(self, path):
+        """Get the MediaPlayer1 interface for a player object path"""
+        obj = dbus.SystemBus().get_object(BLUEZ_SERVICE, path, introspect=False)
+        return dbus.Interface(obj, MEDIA_PLAYER_INTERFACE)
+
+    def _pause_media_players(self):
+        """
+        Pause the source device's stream over AVRCP
+
+        Returns True if a playing stream was paused, so the connection and
+        bluealsa-aplay stay up and resuming is instant. Otherwise the caller
+        stops bluealsa-aplay so nothing competes with mpv for the output.
+        """
+        self.paused_players = []
+        try:
+            players = self._get_media_players()
+        except dbus.exceptions.DBusException as e:
+            logger.warning(f"Could not list Bluetooth media players: {e}")
+            return False
+
+        for path, props in players.items():
+            if str(props.get('Status', '')) != 'playing':
+                continue
+            try:
+                self._media_player(path).Pause(timeout=5)
+                self.paused_players.append(path)
+            except dbus.exceptions.DBusException as e:
+                logger.warning(f"Could not pause media player {path}: {e}")
+        return bool(self.paused_players)
+
+    def _resume_media_players(self):
+        """Resume the streams paused by _pause_media_players"""
+        paused, self.paused_players = self.paused_players, []
+        for path in paused:
+            try:
+                self._media_player(path).Play(timeout=5)
+            except dbus.exceptions.DBusException as e:
+                logger.warning(f"Could not resume media player {path}: {e}")
+
+    def _control_bluealsa_aplay(self, action):
+        """Start or stop bluealsa-aplay via systemd's D-Bus API, falling back to systemctl"""
+        if self.systemd is not None:
+            try:
+                if action == 'stop':
+                    self.systemd.StopUnit(BLUEALSA_APLAY_UNIT, 'replace', signature='ss', timeout=5)
+                else:
+                    self.systemd.StartUnit(BLUEALSA_APLAY_UNIT, 'replace', signature='ss', timeout=5)
+                return
+            except dbus.exceptions.DBusException as e:
+                logger.warning(f"systemd D-Bus call failed, using systemctl: {e}")
+
+        subprocess.run(
+            ['systemctl', action, 'bluealsa-aplay'],
+            timeout=5,
+            check=False
+        )
+
     def pause_bluetooth(self):
         """Pause Bluetooth audio playback"""
         try:
-            subprocess.run(
-                ['systemctl', 'stop', 'bluealsa-aplay'],
-                timeout=5,
-                check=False
-            )
+            if self._pause_media_players():
+                self.bluealsa_stopped = False
+            else:
+                # No playing AVRCP player was paused: stop the BlueALSA output instead
+                self._control_bluealsa_aplay('stop')
+                self.bluealsa_stopped = True
             logger.info("Paused Bluetooth playback")
         except Exception as e:
             logger.error(f"Error pausing Bluetooth: {e}")
@@ -275,31 +755,39 @@ class LocalMusicPlayer:
     def resume_bluetooth(self):
         """Resume Bluetooth audio playback"""
         try:
-            subprocess.run(
-                ['systemctl', 'start', 'bluealsa-aplay'],
-                timeout=5,
-                check=False
-            )
+            self._resume_media_players()
+            if self.bluealsa_stopped:
+                self._control_bluealsa_aplay('start')
+                self.bluealsa_stopped = False
             logger.info("Resumed Bluetooth playback")
         except Exception as e:
             logger.error(f"Error resuming Bluetooth: {e}")
 
-    def get_status(self):
-        """Get current player status"""
-        with self.lock:
-            current_file = None
-            if self.is_playing and self.current_index < len(self.playlist):
-                current_file = os.path.basename(self.playlist[self.current_index])
+    def _publish_status(self):
+        """
+        Build the status dict from the current state
+
+        Called with self.lock held after every state change. The new dict
+        replaces the old one in a single attribute store, so get_status
+        can read it without the lock.
+        """
+        current_file = None
+        if self.is_playing and self.current_index < len(self._order):
+            current_file = self._names[self._order[self.current_index]]
+
+        self._status = {
+            'is_playing': self.is_playing,
+            'is_paused': self.is_paused,
+            'current_file': current_file,
+            'current_index': self.current_index,
+            'total_tracks': len(self._files),
+            'shuffle': self.shuffle,
+            'loop': self.loop
+        }
 
-            return {
-                'is_playing': self.is_playing,
-                'is_paused': self.is_paused,
-                'current_file': current_file,
-                'current_index': self.current_index,
-                'total_tracks': len(self.playlist),
-                'shuffle': self.shuffle,
-                'loop': self.loop
-            }
+    def get_status(self):
+        """Get current player status (a shared snapshot; do not modify it)"""
+        return self._status
 
 
 # Global player instance
@@ -312,19 +800,19 @@ def main():
 
     player = LocalMusicPlayer()
 
-    # Simple event loop to keep the service running
     logger.info("Local music player service started")
     logger.info(f"Music directory: {MUSIC_DIR}")
-    logger.info(f"Loaded {len(player.playlist)} tracks")
 
-    try:
-        while True:
-            time.sleep(1)
+    # Sleep until systemctl stop (SIGTERM) or Ctrl+C (SIGINT)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    stop.wait()
 
-    except KeyboardInterrupt:
-        logger.info("Shutting down...")
-        if player.is_playing:
-            player.stop_playback()
+    logger.info("Shutting down...")
+    if player.is_playing:
+        player.stop_playback()
+    player.close()
 
 
 if __name__ == "__main__":